@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Repost records already stored in jail_records.db to a Discord webhook.
+
+Reads straight from the database, so no PDF is re-parsed and archived
+reports need not be in new/. Rows are read a page at a time by id and
+posted one by one through the rate-limited DiscordPublisher. The last
+handled id is saved to a checkpoint file after every post; rerun the same
+command to resume where it stopped.
+
+    ./backfill.py --webhook URL --since 2025-08-01 --until 2025-08-31
+
+Records Discord rejects outright (e.g. 400 for an oversized embed) are
+logged and skipped. Rate limiting, server errors and network failures that
+outlast the retry policy stop the run so it can be resumed later.
+"""
+import argparse, asyncio, hashlib, json, os, re, sqlite3
+from datetime import datetime
+from parse import DB_FILE, create_database
+from publish import DiscordPublisher, RetryPolicy, MIN_DELAY_BETWEEN_MESSAGES
+
+CHECKPOINT_FILE = ".backfill_checkpoint.json"
+PAGE_SIZE = 25
+
+def iso_date(value):
+    """argparse type for YYYY-MM-DD"""
+    try:
+        if not re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+            raise ValueError
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {value!r}")
+    return value
+
+def report_date(source_pdf):
+    """YYYY-MM-DD from the report filename, None if it has none"""
+    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', source_pdf or "")
+    return date_match.group(1) if date_match else None
+
+def row_to_record(row):
+    """Rebuild the run.py record dict from a jail_records row"""
+    name = row["full_name"]
+    if not name:
+        # Rows saved before full_name existed. parse_name dropped the comma, so
+        # this assumes a one-word surname: "DE LA CRUZ, JUAN" comes back as
+        # "DE, LA CRUZ JUAN".
+        rest = " ".join(p for p in (row["middle_name"], row["last_name"]) if p)
+        name = f"{row['first_name']}, {rest}" if rest else row["first_name"]
+    charges = row["charges"]
+    return {
+        "name": name,
+        "booked": row["booking_date"],
+        "dob": row["date_of_birth"],
+        "gender": row["gender"],
+        "brought": row["arrestor"],
+        "charges": [] if not charges or charges == "None" else charges.split("; "),
+    }
+
+def select_reports(conn, since, until, include_undated):
+    """Source PDFs whose report date falls in since..until (either may be None)"""
+    selected, undated = [], 0
+    # Served from the source_pdf index, so no image blobs are read
+    for source_pdf, count in conn.execute("SELECT source_pdf, COUNT(*) FROM jail_records GROUP BY source_pdf"):
+        date = report_date(source_pdf)
+        if date is None:
+            undated += count
+            if include_undated:
+                selected.append(source_pdf)
+        elif (since is None or date >= since) and (until is None or date <= until):
+            selected.append(source_pdf)
+    if undated and not include_undated:
+        print(f"Skipping {undated} rows whose source_pdf has no date (use --include-undated)")
+    return selected
+
+def iter_pages(db_file, since, until, include_undated=False, after_id=0, page_size=PAGE_SIZE):
+    """Yield lists of rows in id order, one page at a time, for the selected reports"""
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("CREATE TEMP TABLE selected_reports (source_pdf TEXT PRIMARY KEY)")
+        conn.executemany("INSERT INTO selected_reports VALUES (?)",
+                         ((pdf,) for pdf in select_reports(conn, since, until, include_undated)))
+        while True:
+            # Pick the page's ids from the index alone, then read just those rows
+            ids = [r[0] for r in conn.execute('''
+                SELECT id FROM jail_records INDEXED BY jail_records_source_pdf
+                WHERE source_pdf IN (SELECT source_pdf FROM selected_reports) AND id > ?
+                ORDER BY id LIMIT ?
+            ''', (after_id, page_size))]
+            if not ids:
+                return
+            yield conn.execute(f'''
+                SELECT * FROM jail_records WHERE id IN ({",".join("?" * len(ids))}) ORDER BY id
+            ''', ids).fetchall()
+            after_id = ids[-1]
+    finally:
+        conn.close()
+
+def checkpoint_key(webhook, since, until, include_undated):
+    # Hash rather than store the webhook URL, which carries its token
+    return hashlib.sha256(f"{webhook}|{since}|{until}|{include_undated}".encode()).hexdigest()
+
+def load_checkpoint(path, key):
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if saved.get("key") != key:
+        print("Checkpoint is for a different webhook or date range, starting from the beginning")
+        return 0
+    return saved.get("last_id", 0)
+
+def save_checkpoint(path, key, last_id):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"key": key, "last_id": last_id}, f)
+    os.replace(tmp, path)  # never leave a half-written checkpoint behind
+
+async def backfill(args):
+    key = checkpoint_key(args.webhook, args.since, args.until, args.include_undated)
+    last_id = load_checkpoint(args.checkpoint, key)
+    if last_id:
+        print("Resuming after id", last_id)
+
+    posted = skipped = 0
+    current_pdf = None
+    retry = RetryPolicy()
+    async with DiscordPublisher(args.webhook, max_in_flight=1, min_interval=args.interval, retry=retry) as pub:
+        pages = iter_pages(args.db, args.since, args.until, args.include_undated, last_id, args.page_size)
+        for rows in pages:
+            for row in rows:
+                if row["source_pdf"] != current_pdf:
+                    await pub.post_date_embed(row["source_pdf"])
+                    current_pdf = row["source_pdf"]
+
+                # One post at a time, so the checkpoint never runs ahead of or behind Discord
+                status = await pub.post_embed(row_to_record(row), row["image_data"])
+                if status is None or retry.should_retry(status):
+                    print(f"Stopping at id {row['id']}; rerun to resume from there")
+                    print(f"Backfilled {posted} records, skipped {skipped}")
+                    return
+                if status >= 400:
+                    print(f"SKIPPED id {row['id']} ({row['source_pdf']}): HTTP {status}")
+                    skipped += 1
+                else:
+                    posted += 1
+                last_id = row["id"]
+                save_checkpoint(args.checkpoint, key, last_id)
+            print(f"Backfilled {posted} records, skipped {skipped} (through id {last_id})")
+
+    print(f"Done: {posted} records, {skipped} skipped, {pub.metrics.summary()}")
+    if os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--webhook", required=True, help="Discord webhook to post to")
+    parser.add_argument("--since", type=iso_date, help="first report date, YYYY-MM-DD")
+    parser.add_argument("--until", type=iso_date, help="last report date, YYYY-MM-DD")
+    parser.add_argument("--include-undated", action="store_true",
+                        help="also post rows whose source_pdf has no date in its name")
+    parser.add_argument("--db", default=DB_FILE)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="rows read from the database at a time")
+    parser.add_argument("--interval", type=float, default=MIN_DELAY_BETWEEN_MESSAGES, help="seconds between messages")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print("Missing", args.db); return
+    if args.since and args.until and args.since > args.until:
+        parser.error("--since is after --until")
+    create_database(args.db)  # adds full_name and the source_pdf index to older databases
+    asyncio.run(backfill(args))
+
+if __name__ == "__main__":
+    main()
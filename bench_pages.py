@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Measure single-file extraction latency at different page-worker counts.
+
+Runs run.extract_records over the largest reports in archive/ with 1/2/4/8
+page worker processes and reports the best-of-N wall time and speedup over 1.
+
+    python3 bench_pages.py --files 3 --repeat 3 --workers 1 2 4 8
+"""
+import argparse, os, time
+import fitz
+from run import extract_records
+from pages import get_pool
+
+def largest_reports(folder, n):
+    paths = [os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".pdf")]
+    counted = []
+    for p in paths:
+        with fitz.open(p) as doc:
+            counted.append((doc.page_count, p))
+    return sorted(counted, reverse=True)[:n]
+
+def best_time(path, workers, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extract_records(path, workers)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--folder", default="archive")
+    parser.add_argument("--files", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    get_pool(max(args.workers))  # size the shared pool for the largest count; best-of-N hides process start-up
+    print(f"{os.cpu_count()} CPUs")
+    for pages, path in largest_reports(args.folder, args.files):
+        base = None
+        for n in args.workers:
+            elapsed = best_time(path, n, args.repeat)
+            base = base or elapsed
+            print(f"{os.path.basename(path)} ({pages} pages)  {n} workers  {elapsed:7.3f}s  x{base / elapsed:.2f}")
+
+if __name__ == "__main__":
+    main()
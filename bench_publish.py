@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark the async publisher against one requests.post per message.
+
+Starts a local stand-in for the Discord webhook, posts the same synthetic
+records through both paths with rate limiting disabled, and reports
+messages/second and how many TCP connections each path opened.
+
+    python3 bench_publish.py --messages 200 --in-flight 4 --latency 0.02
+"""
+import argparse, asyncio, contextlib, io, json, os, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from publish import DiscordPublisher, record_embed
+
+class StandInWebhook(BaseHTTPRequestHandler):
+    """Accepts multipart posts like Discord does and answers 204"""
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients can reuse sockets
+    latency = 0.0
+    connections = set()
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with StandInWebhook.lock:
+            StandInWebhook.connections.add(self.client_address)
+            StandInWebhook.requests_seen += 1
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+def start_server(latency):
+    StandInWebhook.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInWebhook)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/webhook"
+
+def reset_counters():
+    StandInWebhook.connections = set()
+    StandInWebhook.requests_seen = 0
+
+def make_records(n, image_size):
+    image = os.urandom(image_size)  # shared buffer, like a mugshot held in memory
+    rec = {"name": "DOE, JOHN", "booked": "8/28/2025 1:23:45 AM", "dob": "1/1/1990",
+           "gender": "MALE", "brought": "MCSO", "charges": ["State 18-4-401 THEFT"]}
+    return [(dict(rec, name=f"DOE, JOHN {i}"), image) for i in range(n)]
+
+def legacy_post(webhook, record, image_bytes):
+    """The old run.py path: module-level requests.post, new connection every time"""
+    payload = {"embeds": [record_embed(record, bool(image_bytes))]}
+    data = {"payload_json": json.dumps(payload)}
+    files = {"file": ("mug.png", image_bytes, "image/png")} if image_bytes else None
+    return requests.post(webhook, data=data, files=files, timeout=30).status_code
+
+def bench_legacy(webhook, records):
+    start = time.perf_counter()
+    for rec, img in records:
+        legacy_post(webhook, rec, img)
+    return time.perf_counter() - start
+
+async def bench_async(webhook, records, in_flight):
+    async with DiscordPublisher(webhook, max_in_flight=in_flight, min_interval=0) as pub:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # drop the per-post log lines
+            await pub.post_records(records, ordered=False)
+        return time.perf_counter() - start
+
+def report(label, elapsed, n):
+    print(f"{label:<24} {elapsed:8.3f}s  {n / elapsed:8.1f} msg/s  "
+          f"{len(StandInWebhook.connections):4d} connections  {StandInWebhook.requests_seen} requests")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--image-size", type=int, default=20_000, help="bytes per mugshot")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated server time per post (s)")
+    args = parser.parse_args()
+
+    server, webhook = start_server(args.latency)
+    records = make_records(args.messages, args.image_size)
+    print(f"{args.messages} messages, {args.image_size} byte images, {args.latency * 1000:.0f}ms server latency")
+
+    reset_counters()
+    report("requests.post", bench_legacy(webhook, records), len(records))
+    for n in args.in_flight:
+        reset_counters()
+        report(f"DiscordPublisher x{n}", asyncio.run(bench_async(webhook, records, n)), len(records))
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Measure start-up cost of the CLI scripts.
+
+Reports the cumulative -X importtime of each entry point, the wall time of
+a run.py tick with nothing in new/, and cold vs warm-worker extraction of
+one report.
+
+    python3 bench_startup.py --pdf "archive/Mesa County Jail Records (3) 2025-08-28.pdf"
+"""
+import argparse, os, shutil, subprocess, sys, tempfile, time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def import_time_ms(module, cwd):
+    """Cumulative import time of module as reported by -X importtime"""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=cwd, env=dict(os.environ, PYTHONPATH=HERE),
+                         capture_output=True, text=True).stderr
+    for line in reversed(out.splitlines()):
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    return float("nan")
+
+def wall_time(cmd, cwd, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", default=None, help="report to time cold vs warm extraction on")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "new"))
+        os.makedirs(os.path.join(tmp, "archive"))
+
+        for module in ("run", "parse", "gather", "fitz", "pdfplumber", "aiohttp", "requests"):
+            print(f"import {module:<12} {import_time_ms(module, tmp):8.1f} ms")
+        noop = wall_time([sys.executable, os.path.join(HERE, "run.py")], tmp, args.repeat)
+        print(f"run.py no-op tick    {noop * 1000:8.1f} ms")
+
+        if not args.pdf:
+            return
+        pdf = shutil.copy(args.pdf, tmp)
+        extract = [sys.executable, "-c", f"import run; run.extract({os.path.basename(pdf)!r})"]
+        env_cmd = ["env", f"PYTHONPATH={HERE}"]
+        cold = wall_time(env_cmd + extract, tmp, args.repeat)
+        print(f"extract, cold        {cold * 1000:8.1f} ms")
+
+        worker = subprocess.Popen(env_cmd + [sys.executable, os.path.join(HERE, "worker.py")],
+                                  cwd=tmp, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            sock = os.path.join(tmp, ".pdfworker.sock")
+            deadline = time.monotonic() + 60
+            while not os.path.exists(sock):
+                if worker.poll() is not None:
+                    print(f"worker exited with status {worker.returncode} before listening")
+                    return
+                if time.monotonic() > deadline:
+                    print("worker did not start listening within 60s")
+                    return
+                time.sleep(0.05)
+            warm = wall_time(env_cmd + extract, tmp, args.repeat)
+            print(f"extract, warm worker {warm * 1000:8.1f} ms")
+        finally:
+            worker.terminate()
+            worker.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+import multiprocessing, threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Processes used to extract pages of a single PDF. PyMuPDF does not support
+# threads, even on separate documents, so callers extract one report at a
+# time on one thread and parallelism (when asked for) uses separate processes.
+PAGE_WORKERS = 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool(workers):
+    """Shared process pool for page work, sized by the first caller and then reused"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: run.py has asyncio/aiohttp threads running by the time pages are extracted
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _extract_stride(pdf_path, extract_page, start, step):
+    """Extract every step-th page from start with this worker's own document handles.
+
+    Each task opens its own pdfplumber and fitz handles, and striding spreads
+    heavy pages evenly across the workers.
+    """
+    import fitz, pdfplumber
+    results = []
+    with pdfplumber.open(pdf_path) as pp, fitz.open(pdf_path) as doc:
+        for pidx in range(start, len(pp.pages), step):
+            results.append((pidx, extract_page(pp.pages[pidx], doc, pidx)))
+    return results
+
+def map_pages(pdf_path, extract_page, workers=PAGE_WORKERS):
+    """Run extract_page(page_pp, doc, pidx) over every page, records returned in page order"""
+    import fitz
+    with fitz.open(pdf_path) as doc:
+        page_count = doc.page_count
+    workers = max(1, min(workers, page_count))
+
+    if workers == 1:
+        by_page = _extract_stride(pdf_path, extract_page, 0, 1)
+    else:
+        pool = get_pool(workers)
+        futures = [pool.submit(_extract_stride, pdf_path, extract_page, k, workers) for k in range(workers)]
+        by_page = [item for f in futures for item in f.result()]
+
+    by_page.sort(key=lambda x: x[0])
+    return [rec for _, recs in by_page for rec in recs]
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import os, io, shutil, re, sqlite3
-import fitz, pdfplumber
-from PIL import Image
+from pages import map_pages, PAGE_WORKERS
+from worker import extract_via_worker
 
 SRC = "archive"
 DST = "archive"  # Keep processed files in archive
@@ -26,9 +26,9 @@ def parse_name(full_name):
         # First name, middle names, last name
         return name_parts[0], " ".join(name_parts[1:-1]), name_parts[-1]
 
-def create_database():
+def create_database(db_file=DB_FILE):
     """Create SQLite database and table for jail records"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(db_file)
     cursor = conn.cursor()
     
     # Create table for jail records
@@ -38,6 +38,7 @@ def create_database():
             first_name TEXT,
             middle_name TEXT,
             last_name TEXT,
+            full_name TEXT,
             booking_date TEXT,
             date_of_birth TEXT,
             gender TEXT,
@@ -48,14 +49,22 @@ def create_database():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
+
+    # Databases created before full_name existed only have the split name
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(jail_records)")]
+    if "full_name" not in columns:
+        cursor.execute("ALTER TABLE jail_records ADD COLUMN full_name TEXT")
+
+    # Lets backfill.py find a report's rows without reading the image blobs
+    cursor.execute("CREATE INDEX IF NOT EXISTS jail_records_source_pdf ON jail_records (source_pdf)")
+
     conn.commit()
     conn.close()
-    print(f"Database created/verified: {DB_FILE}")
+    print(f"Database created/verified: {db_file}")
 
-def save_records_to_database(records_with_images, pdf_filename):
+def save_records_to_database(records_with_images, pdf_filename, db_file=DB_FILE):
     """Save all records from a PDF to SQLite database"""
-    conn = sqlite3.connect(DB_FILE)
+    conn = sqlite3.connect(db_file)
     cursor = conn.cursor()
     
     for record, image_bytes in records_with_images:
@@ -74,209 +83,213 @@ def save_records_to_database(records_with_images, pdf_filename):
         # Insert record into database
         cursor.execute('''
             INSERT INTO jail_records 
-            (first_name, middle_name, last_name, booking_date, date_of_birth, 
+            (first_name, middle_name, last_name, full_name, booking_date, date_of_birth,
              gender, arrestor, charges, image_data, source_pdf)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (first_name, middle_name, last_name, booking_date, dob, 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (first_name, middle_name, last_name, record['name'].strip(), booking_date, dob,
               gender, arrestor, charges_text, image_bytes, pdf_filename))
     
     conn.commit()
     conn.close()
     print(f"Saved {len(records_with_images)} records to database from {pdf_filename}")
 
-def extract_records(pdf_path):
+def extract_page(page_pp, doc, pidx):
+    """Extract (record, image_bytes) pairs from one page"""
+    import fitz
+    from PIL import Image
     out = []
-    with pdfplumber.open(pdf_path) as pp, fitz.open(pdf_path) as doc:
-        for pidx, page_pp in enumerate(pp.pages):
-            words = page_pp.extract_words()
-            lines = []
-            if words:
-                cur_top = None
-                bucket = []
-                for w in words:
-                    if cur_top is None:
-                        cur_top = w['top']
-                    if abs(w['top'] - cur_top) <= 3:
-                        bucket.append(w)
-                    else:
-                        lines.append((" ".join(x['text'] for x in bucket).strip(), cur_top))
-                        bucket = [w]
-                        cur_top = w['top']
-                if bucket:
-                    lines.append((" ".join(x['text'] for x in bucket).strip(), cur_top))
+    words = page_pp.extract_words()
+    lines = []
+    if words:
+        cur_top = None
+        bucket = []
+        for w in words:
+            if cur_top is None:
+                cur_top = w['top']
+            if abs(w['top'] - cur_top) <= 3:
+                bucket.append(w)
             else:
-                raw = page_pp.extract_text() or ""
-                lines = [(l, 0) for l in raw.splitlines()]
+                lines.append((" ".join(x['text'] for x in bucket).strip(), cur_top))
+                bucket = [w]
+                cur_top = w['top']
+        if bucket:
+            lines.append((" ".join(x['text'] for x in bucket).strip(), cur_top))
+    else:
+        raw = page_pp.extract_text() or ""
+        lines = [(l, 0) for l in raw.splitlines()]
+
+    page_img_regions = []
+    full_img = None
+    try:
+        full_pix = doc[pidx].get_pixmap(matrix=fitz.Matrix(2,2))
+        full_img = Image.open(io.BytesIO(full_pix.tobytes("png")))
+        scale_y = full_img.height / page_pp.height if page_pp.height else 1.0
+    except Exception:
+        full_img = None
+        scale_y = 1.0
+
+    for im in (page_pp.images or []):
+        try:
+            x0 = int(im.get("x0", 0))
+            top = int(im.get("top", 0))
+            x1 = int(im.get("x1", 0))
+            bottom = int(im.get("bottom", 0))
+            if full_img and x1 > x0 and bottom > top:
+                sx = full_img.width / page_pp.width if page_pp.width else 1.0
+                sy = full_img.height / page_pp.height if page_pp.height else 1.0
+                
+                # Skip header images (usually at top of page, small, or logo-like)
+                img_height = (bottom - top) * sy
+                img_width = (x1 - x0) * sx
+                
+                # Skip images that are too small (likely logos/headers)
+                if img_height < 50 or img_width < 50:
+                    continue
+                    
+                # Skip images at the very top of the page (headers)
+                if top * sy < 100:
+                    continue
+                    
+                crop = full_img.crop((int(x0 * sx), int(top * sy), int(x1 * sx), int(bottom * sy)))
+                buf = io.BytesIO()
+                crop.save(buf, "PNG")
+                buf.seek(0)
+                img_bytes = buf.getvalue()
+                
+                # Validate the image bytes before adding
+                if img_bytes and len(img_bytes) > 100:  # Basic validation
+                    page_img_regions.append({"mid_y": (top + bottom) * 0.5, "bytes": img_bytes})
+                else:
+                    # Add placeholder for invalid/broken image
+                    page_img_regions.append({"mid_y": (top + bottom) * 0.5, "bytes": None})
+        except Exception:
+            continue
 
-            page_img_regions = []
-            full_img = None
+    # If no images found with coordinates, try fitz method
+    if not page_img_regions:
+        imgs = doc[pidx].get_images(full=True) or []
+        seq = []
+        for im in imgs:
             try:
-                full_pix = doc[pidx].get_pixmap(matrix=fitz.Matrix(2,2))
-                full_img = Image.open(io.BytesIO(full_pix.tobytes("png")))
-                scale_y = full_img.height / page_pp.height if page_pp.height else 1.0
+                xref = im[0]
+                pix = fitz.Pixmap(doc, xref)
+                if pix.n - pix.alpha < 4:
+                    imgbytes = pix.tobytes("png")
+                else:
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                    imgbytes = pix.tobytes("png")
+                # Validate the image bytes before adding
+                if imgbytes and len(imgbytes) > 100:  # Basic validation
+                    seq.append(imgbytes)
             except Exception:
-                full_img = None
-                scale_y = 1.0
-
-            for im in (page_pp.images or []):
+                continue
+        for b in seq:
+            page_img_regions.append({"mid_y": None, "bytes": b})
+    
+    # If we still have no images, try extracting all images from the page
+    if not page_img_regions:
+        try:
+            # Get all images from the page using fitz
+            image_list = doc[pidx].get_images()
+            for img_index, img in enumerate(image_list):
                 try:
-                    x0 = int(im.get("x0", 0))
-                    top = int(im.get("top", 0))
-                    x1 = int(im.get("x1", 0))
-                    bottom = int(im.get("bottom", 0))
-                    if full_img and x1 > x0 and bottom > top:
-                        sx = full_img.width / page_pp.width if page_pp.width else 1.0
-                        sy = full_img.height / page_pp.height if page_pp.height else 1.0
-                        
-                        # Skip header images (usually at top of page, small, or logo-like)
-                        img_height = (bottom - top) * sy
-                        img_width = (x1 - x0) * sx
-                        
-                        # Skip images that are too small (likely logos/headers)
-                        if img_height < 50 or img_width < 50:
-                            continue
-                            
-                        # Skip images at the very top of the page (headers)
-                        if top * sy < 100:
-                            continue
-                            
-                        crop = full_img.crop((int(x0 * sx), int(top * sy), int(x1 * sx), int(bottom * sy)))
-                        buf = io.BytesIO()
-                        crop.save(buf, "PNG")
-                        buf.seek(0)
-                        img_bytes = buf.getvalue()
-                        
-                        # Validate the image bytes before adding
-                        if img_bytes and len(img_bytes) > 100:  # Basic validation
-                            page_img_regions.append({"mid_y": (top + bottom) * 0.5, "bytes": img_bytes})
-                        else:
-                            # Add placeholder for invalid/broken image
-                            page_img_regions.append({"mid_y": (top + bottom) * 0.5, "bytes": None})
+                    xref = img[0]
+                    pix = fitz.Pixmap(doc, xref)
+                    if pix.n - pix.alpha < 4:
+                        imgbytes = pix.tobytes("png")
+                    else:
+                        pix = fitz.Pixmap(fitz.csRGB, pix)
+                        imgbytes = pix.tobytes("png")
+                    # Validate the image bytes before adding
+                    if imgbytes and len(imgbytes) > 100:  # Basic validation
+                        page_img_regions.append({"mid_y": None, "bytes": imgbytes})
                 except Exception:
                     continue
+        except Exception:
+            pass
 
-            # If no images found with coordinates, try fitz method
-            if not page_img_regions:
-                imgs = doc[pidx].get_images(full=True) or []
-                seq = []
-                for im in imgs:
-                    try:
-                        xref = im[0]
-                        pix = fitz.Pixmap(doc, xref)
-                        if pix.n - pix.alpha < 4:
-                            imgbytes = pix.tobytes("png")
-                        else:
-                            pix = fitz.Pixmap(fitz.csRGB, pix)
-                            imgbytes = pix.tobytes("png")
-                        # Validate the image bytes before adding
-                        if imgbytes and len(imgbytes) > 100:  # Basic validation
-                            seq.append(imgbytes)
-                    except Exception:
+    name_entries = []
+    for idx, (text, top) in enumerate(lines):
+        m = name_row.match(text)
+        if m:
+            rec = m.groupdict()
+            rec['charges'] = []
+            j = idx + 1
+            while j < len(lines) and not name_row.match(lines[j][0]):
+                ln = lines[j][0].strip()
+                if ln:
+                    # Skip address lines (start with numbers and contain street indicators)
+                    if re.match(r'^\d+.*(AVE|ST|RD|DR|BLVD|WAY|CT|PL|LN|CIR)', ln, re.IGNORECASE):
+                        j += 1
                         continue
-                for b in seq:
-                    page_img_regions.append({"mid_y": None, "bytes": b})
-            
-            # If we still have no images, try extracting all images from the page
-            if not page_img_regions:
-                try:
-                    # Get all images from the page using fitz
-                    image_list = doc[pidx].get_images()
-                    for img_index, img in enumerate(image_list):
-                        try:
-                            xref = img[0]
-                            pix = fitz.Pixmap(doc, xref)
-                            if pix.n - pix.alpha < 4:
-                                imgbytes = pix.tobytes("png")
-                            else:
-                                pix = fitz.Pixmap(fitz.csRGB, pix)
-                                imgbytes = pix.tobytes("png")
-                            # Validate the image bytes before adding
-                            if imgbytes and len(imgbytes) > 100:  # Basic validation
-                                page_img_regions.append({"mid_y": None, "bytes": imgbytes})
-                        except Exception:
-                            continue
-                except Exception:
-                    pass
-
-            name_entries = []
-            for idx, (text, top) in enumerate(lines):
-                m = name_row.match(text)
-                if m:
-                    rec = m.groupdict()
-                    rec['charges'] = []
-                    j = idx + 1
-                    while j < len(lines) and not name_row.match(lines[j][0]):
-                        ln = lines[j][0].strip()
-                        if ln:
-                            # Skip address lines (start with numbers and contain street indicators)
-                            if re.match(r'^\d+.*(AVE|ST|RD|DR|BLVD|WAY|CT|PL|LN|CIR)', ln, re.IGNORECASE):
-                                j += 1
-                                continue
-                            # Skip "Charge Description" header
-                            if ln.startswith("Charge Description"):
-                                j += 1
-                                continue
-                            # Skip page numbers
-                            if ln.startswith("Page ") and " of " in ln:
-                                j += 1
-                                continue
-                            # Skip empty lines or just whitespace
-                            if not ln or ln.isspace():
-                                j += 1
-                                continue
-                            # Add actual charge lines (start with "State")
-                            if ln.startswith("State "):
-                                rec['charges'].append(ln)
+                    # Skip "Charge Description" header
+                    if ln.startswith("Charge Description"):
                         j += 1
-                    name_entries.append({"rec": rec, "top": top})
+                        continue
+                    # Skip page numbers
+                    if ln.startswith("Page ") and " of " in ln:
+                        j += 1
+                        continue
+                    # Skip empty lines or just whitespace
+                    if not ln or ln.isspace():
+                        j += 1
+                        continue
+                    # Add actual charge lines (start with "State")
+                    if ln.startswith("State "):
+                        rec['charges'].append(ln)
+                j += 1
+            name_entries.append({"rec": rec, "top": top})
 
-            if not name_entries:
-                continue
+    if not name_entries:
+        return out
 
-            # Use optimal matching - find the best global assignment
-            name_entries.sort(key=lambda x: x["top"])
-            page_img_regions.sort(key=lambda x: x["mid_y"] if x["mid_y"] is not None else float('inf'))
-            
-            # Create distance matrix for all name-image pairs
-            distances = []
-            for i, ne in enumerate(name_entries):
-                for j, img_region in enumerate(page_img_regions):
-                    if img_region["mid_y"] is not None:
-                        distance = abs(img_region["mid_y"] - ne["top"])
-                    else:
-                        distance = float('inf')
-                    distances.append((distance, i, j))
-            
-            # Sort by distance to get optimal assignments
-            distances.sort()
-            
-            # Track which names and images have been assigned
-            assigned_names = set()
-            assigned_images = set()
-            
-            # Assign images to names in order of best distance
+    # Use optimal matching - find the best global assignment
+    name_entries.sort(key=lambda x: x["top"])
+    page_img_regions.sort(key=lambda x: x["mid_y"] if x["mid_y"] is not None else float('inf'))
+    
+    # Create distance matrix for all name-image pairs
+    distances = []
+    for i, ne in enumerate(name_entries):
+        for j, img_region in enumerate(page_img_regions):
+            if img_region["mid_y"] is not None:
+                distance = abs(img_region["mid_y"] - ne["top"])
+            else:
+                distance = float('inf')
+            distances.append((distance, i, j))
+    
+    # Sort by distance to get optimal assignments
+    distances.sort()
+    
+    # Track which names and images have been assigned
+    assigned_names = set()
+    assigned_images = set()
+    
+    # Assign images to names in order of best distance
+    for distance, name_idx, img_idx in distances:
+        if name_idx not in assigned_names and img_idx not in assigned_images:
+            if distance < 200:  # Only assign if reasonably close
+                assigned_names.add(name_idx)
+                assigned_images.add(img_idx)
+    
+    # Create results in original order
+    for i, ne in enumerate(name_entries):
+        if i in assigned_names:
+            # Find which image was assigned to this name
             for distance, name_idx, img_idx in distances:
-                if name_idx not in assigned_names and img_idx not in assigned_images:
-                    if distance < 200:  # Only assign if reasonably close
-                        assigned_names.add(name_idx)
-                        assigned_images.add(img_idx)
-            
-            # Create results in original order
-            for i, ne in enumerate(name_entries):
-                if i in assigned_names:
-                    # Find which image was assigned to this name
-                    for distance, name_idx, img_idx in distances:
-                        if name_idx == i and img_idx in assigned_images:
-                            img_bytes = page_img_regions[img_idx]["bytes"]
-                            break
-                    else:
-                        img_bytes = None
-                else:
-                    img_bytes = None
-                
-                out.append((ne["rec"], img_bytes))
+                if name_idx == i and img_idx in assigned_images:
+                    img_bytes = page_img_regions[img_idx]["bytes"]
+                    break
+            else:
+                img_bytes = None
+        else:
+            img_bytes = None
+        
+        out.append((ne["rec"], img_bytes))
     return out
 
+def extract_records(pdf_path, workers=PAGE_WORKERS):
+    return map_pages(pdf_path, extract_page, workers)
+
 def main():
     # Create database first
     create_database()
@@ -290,7 +303,9 @@ def main():
         path = os.path.join(SRC, f)
         print("Process", f)
         try:
-            recs = extract_records(path)
+            recs = extract_via_worker(path, "parse")
+            if recs is None:
+                recs = extract_records(path)
             print("Records", len(recs))
             if recs:
                 save_records_to_database(recs, f)
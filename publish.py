@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+import asyncio, json, re, time
+from datetime import datetime
+import aiohttp
+
+GREY = 0x1f1f1f
+GREEN = 0x00ff00
+
+# Discord rate limits: 30 messages per minute, 50 requests per second
+MESSAGES_PER_MINUTE = 30
+REQUESTS_PER_SECOND = 50
+MIN_DELAY_BETWEEN_MESSAGES = 5  # TEMPORARY: 5 seconds between messages
+MIN_DELAY_BETWEEN_REQUESTS = 1 / REQUESTS_PER_SECOND   # 0.02 seconds
+MAX_IN_FLIGHT = 4  # Requests allowed on the wire at once
+
+def record_embed(record, has_image):
+    """Build the embed for a single booking record"""
+    desc = (
+        f"**Booking:** {record['booked']}\n**DOB:** {record['dob']}\n**Gender:** {record['gender']}\n"
+        f"**Arrestor:** {record['brought']}\n**Charges:**\n" + ("\n".join(record['charges']) or "None")
+    )
+
+    # Create embed with large thumbnail at top right
+    embed = {"title": record['name'], "description": desc, "color": GREY}
+    if has_image:
+        embed["thumbnail"] = {"url": "attachment://mug.png"}
+    return embed
+
+def friendly_date(filename):
+    """Turn "Mesa County Jail Records (3) 2025-08-28.pdf" into "Thursday, August 28, 2025" """
+    date_match = re.search(r'(\d{4}-\d{2}-\d{2})', filename)
+    if not date_match:
+        return "Unknown Date"
+    date_str = date_match.group(1)
+    try:
+        return datetime.strptime(date_str, '%Y-%m-%d').strftime('%A, %B %d, %Y')
+    except ValueError:
+        return date_str
+
+def date_embed(filename):
+    """Build the embed announcing which document is being processed"""
+    return {
+        "title": "📅 Processing Document",
+        "description": f"**Date:** {friendly_date(filename)}\n**File:** {filename}",
+        "color": GREEN
+    }
+
+class RateLimiter:
+    """Space out message starts and cap how many requests are in flight.
+
+    Slots are handed out in arrival order, but concurrent requests can still
+    complete out of order; callers that need ordering post one at a time.
+    """
+
+    def __init__(self, min_interval=MIN_DELAY_BETWEEN_MESSAGES, max_in_flight=MAX_IN_FLIGHT):
+        self.min_interval = max(min_interval, MIN_DELAY_BETWEEN_REQUESTS) if min_interval else 0
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.lock = asyncio.Lock()
+        self.last_start = 0.0
+
+    async def __aenter__(self):
+        await self.slots.acquire()
+        try:
+            async with self.lock:
+                wait = self.last_start + self.min_interval - time.monotonic()
+                if wait > 0:
+                    if wait >= 1:
+                        print(f"Rate limiting: sleeping {wait:.1f}s")
+                    await asyncio.sleep(wait)
+                self.last_start = time.monotonic()
+        except BaseException:
+            self.slots.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        self.slots.release()
+
+class RetryPolicy:
+    """How many times to try a delivery and how long to back off between tries"""
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, attempts=3, backoff=1.0, max_delay=60):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def should_retry(self, status):
+        return status in self.RETRY_STATUSES
+
+    def delay(self, attempt, retry_after=None):
+        """Honour the server's Retry-After when given, else back off exponentially"""
+        try:
+            if retry_after is not None:
+                return min(float(retry_after), self.max_delay)
+        except ValueError:
+            pass
+        return min(self.backoff * 2 ** (attempt - 1), self.max_delay)
+
+class Metrics:
+    """Delivery counters for one destination"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.started = None
+        self.finished = None
+
+    def begin(self):
+        if self.started is None:
+            self.started = time.monotonic()
+
+    def add(self, ok, count=1):
+        if ok:
+            self.sent += count
+        else:
+            self.failed += count
+        self.finished = time.monotonic()
+
+    def summary(self):
+        elapsed = (self.finished - self.started) if self.started and self.finished else 0
+        rate = self.sent / elapsed if elapsed else 0
+        return (f"sent {self.sent}, failed {self.failed}, retries {self.retries}, "
+                f"{elapsed:.1f}s, {rate:.2f} msg/s")
+
+class WebhookPublisher:
+    """POST to one URL over a keep-alive connection pool with rate limiting and retries.
+
+    Use as ``async with WebhookPublisher(url) as pub:``; the session and its
+    connections live for the whole block instead of one TLS handshake per post.
+    """
+
+    def __init__(self, url, max_in_flight=MAX_IN_FLIGHT, min_interval=MIN_DELAY_BETWEEN_MESSAGES,
+                 retry=None, timeout=30):
+        self.url = url
+        self.max_in_flight = max_in_flight
+        self.limiter = RateLimiter(min_interval, max_in_flight)
+        self.retry = retry or RetryPolicy()
+        self.metrics = Metrics()
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_in_flight, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    async def send(self, make_body, counted=True):
+        """POST the session.post kwargs returned by make_body() and return the HTTP status.
+
+        make_body is called once per attempt because aiohttp request bodies
+        can only be written once. Network errors that outlast the retry
+        policy are raised; HTTP errors are returned as their status.
+        counted=False keeps housekeeping posts out of the delivery metrics.
+        """
+        metrics = self.metrics if counted else Metrics()
+        metrics.begin()
+        for attempt in range(1, self.retry.attempts + 1):
+            retry_after = None
+            try:
+                async with self.limiter:
+                    async with self.session.post(self.url, **make_body()) as r:
+                        await r.read()
+                        status, retry_after = r.status, r.headers.get("Retry-After")
+                error = None if status < 400 else f"HTTP {status}"
+                retryable = self.retry.should_retry(status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, error, retryable = None, e, True
+
+            if error is None or not retryable or attempt == self.retry.attempts:
+                metrics.add(error is None)
+                if status is None:
+                    raise error
+                return status
+
+            metrics.retries += 1
+            delay = self.retry.delay(attempt, retry_after)
+            print(f"Retry {attempt}/{self.retry.attempts - 1} in {delay:.1f}s: {error}")
+            await asyncio.sleep(delay)
+
+class DiscordPublisher(WebhookPublisher):
+    """Post booking embeds to a Discord webhook"""
+
+    def _form(self, payload, image_bytes=None):
+        form = aiohttp.FormData()
+        form.add_field("payload_json", json.dumps(payload), content_type="application/json")
+        if image_bytes:
+            # bytes/memoryview are wrapped, not copied; aiohttp writes straight from the buffer
+            form.add_field("file", image_bytes, filename="mug.png", content_type="image/png")
+        return {"data": form}
+
+    async def post_embed(self, record, image_bytes):
+        payload = {"embeds": [record_embed(record, bool(image_bytes))]}
+        try:
+            status = await self.send(lambda: self._form(payload, image_bytes))
+            print("POST", record['name'], status)
+            return status
+        except Exception as e:
+            print("POST ERROR", record.get("name"), e)
+
+    async def post_date_embed(self, filename):
+        """Send a date embed to show which document is being processed"""
+        payload = {"embeds": [date_embed(filename)]}
+        try:
+            status = await self.send(lambda: self._form(payload), counted=False)
+            print("DATE POST", friendly_date(filename), status)
+            return status
+        except Exception as e:
+            print("DATE POST ERROR", e)
+
+    async def post_records(self, records, ordered=True):
+        """Post (record, image_bytes) pairs and return their statuses.
+
+        Ordered posting sends one record at a time, retries included, so the
+        channel reads in report order. ordered=False overlaps up to
+        max_in_flight posts; they can then land out of order, and a retried
+        post goes to the back because its backoff sleep is outside the limiter.
+        """
+        if ordered:
+            return [await self.post_embed(rec, img) for rec, img in records]
+        return await asyncio.gather(*(self.post_embed(rec, img) for rec, img in records))
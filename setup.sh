@@ -1,5 +1,5 @@
 #!/bin/bash
 mkdir -p new archive
-pip3 install --user --break-system-packages PyMuPDF pdfplumber pillow requests
-/opt/homebrew/bin/python3.12 -m pip install --user --break-system-packages PyMuPDF pdfplumber pillow requests
+pip3 install --user --break-system-packages PyMuPDF pdfplumber pillow requests aiohttp
+/opt/homebrew/bin/python3.12 -m pip install --user --break-system-packages PyMuPDF pdfplumber pillow requests aiohttp
 chmod +x run.py
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+import asyncio, base64, sqlite3
+from publish import DiscordPublisher, WebhookPublisher, RateLimiter, RetryPolicy, Metrics, MAX_IN_FLIGHT
+from parse import create_database, save_records_to_database, DB_FILE
+
+QUEUE_DEPTH = 4  # documents a sink may fall behind before extraction waits for it
+DOCUMENT_DELAY = 5  # TEMPORARY: 5 second delay between documents on Discord
+
+class Sink:
+    """A destination for extracted records.
+
+    Every sink has its own rate limiter, retry policy and Metrics, and FanOut
+    feeds it through its own queue, so sinks drain at independent rates.
+    """
+    name = "sink"
+
+    def __init__(self, name=None):
+        if name:
+            self.name = name
+        self.metrics = Metrics()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def announce(self, filename):
+        """Called before a document is extracted, so even a failed PDF can be noted"""
+        pass
+
+    async def publish(self, filename, records):
+        """Deliver one document's (record, image_bytes) pairs"""
+        raise NotImplementedError
+
+class DiscordSink(Sink):
+    """Date embed followed by one embed per record, like run.py has always posted"""
+    name = "discord"
+
+    def __init__(self, webhook, name=None, document_delay=DOCUMENT_DELAY, **publisher_opts):
+        super().__init__(name)
+        self.publisher = DiscordPublisher(webhook, **publisher_opts)
+        self.metrics = self.publisher.metrics
+        self.document_delay = document_delay
+        self._announced = False
+
+    async def __aenter__(self):
+        await self.publisher.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.publisher.__aexit__(*exc)
+
+    async def announce(self, filename):
+        # Only this webhook waits; the other sinks keep draining their queues
+        if self._announced and self.document_delay:
+            print(f"{self.name}: waiting {self.document_delay} seconds before next document...")
+            await asyncio.sleep(self.document_delay)
+        self._announced = True
+        await self.publisher.post_date_embed(filename)
+
+    async def publish(self, filename, records):
+        await self.publisher.post_records(records)
+
+class JSONWebhookSink(Sink):
+    """POST each record as a JSON document to a generic webhook"""
+    name = "json"
+
+    def __init__(self, url, name=None, include_images=True, max_in_flight=MAX_IN_FLIGHT,
+                 min_interval=0, retry=None):
+        super().__init__(name)
+        self.include_images = include_images
+        self.publisher = WebhookPublisher(url, max_in_flight=max_in_flight,
+                                          min_interval=min_interval, retry=retry)
+        self.metrics = self.publisher.metrics
+
+    async def __aenter__(self):
+        await self.publisher.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.publisher.__aexit__(*exc)
+
+    async def post_record(self, filename, record, image_bytes):
+        body = {"source_pdf": filename, "record": record}
+        if self.include_images and image_bytes:
+            body["image_png_base64"] = base64.b64encode(image_bytes).decode("ascii")
+        try:
+            status = await self.publisher.send(lambda: {"json": body})
+            print(f"{self.name.upper()} POST", record['name'], status)
+        except Exception as e:
+            print(f"{self.name.upper()} POST ERROR", record.get("name"), e)
+
+    async def publish(self, filename, records):
+        await asyncio.gather(*(self.post_record(filename, rec, img) for rec, img in records))
+
+class SQLiteSink(Sink):
+    """Store records in jail_records.db, one transaction per document"""
+    name = "sqlite"
+
+    def __init__(self, db_file=DB_FILE, name=None, retry=None):
+        super().__init__(name)
+        self.db_file = db_file
+        self.limiter = RateLimiter(0, 1)  # SQLite takes one writer at a time
+        self.retry = retry or RetryPolicy(attempts=5, backoff=0.5)
+
+    async def __aenter__(self):
+        await asyncio.to_thread(create_database, self.db_file)
+        return self
+
+    async def publish(self, filename, records):
+        if not records:
+            return
+        self.metrics.begin()
+        for attempt in range(1, self.retry.attempts + 1):
+            try:
+                async with self.limiter:
+                    await asyncio.to_thread(save_records_to_database, records, filename, self.db_file)
+                self.metrics.add(True, len(records))
+                return
+            except sqlite3.OperationalError as e:  # usually "database is locked"
+                if attempt == self.retry.attempts:
+                    self.metrics.add(False, len(records))
+                    print("SQLITE ERROR", filename, e)
+                    return
+                self.metrics.retries += 1
+                delay = self.retry.delay(attempt)
+                print(f"Retry {attempt}/{self.retry.attempts - 1} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+class FanOut:
+    """Feed documents to every sink through its own queue and consumer task.
+
+    Sinks drain independently: a Discord sink spacing messages 5s apart does
+    not hold up the JSON or SQLite sinks. Extraction only waits once the
+    slowest sink is QUEUE_DEPTH documents behind.
+    """
+
+    def __init__(self, sinks, depth=QUEUE_DEPTH):
+        self.sinks = sinks
+        self.queues = [asyncio.Queue(depth) for _ in sinks]
+        self.consumers = []
+
+    async def __aenter__(self):
+        self.consumers = [asyncio.create_task(self._consume(sink, queue))
+                          for sink, queue in zip(self.sinks, self.queues)]
+        return self
+
+    async def __aexit__(self, *exc):
+        for queue in self.queues:
+            await queue.put(None)
+        await asyncio.gather(*self.consumers)
+
+    async def announce(self, filename):
+        for queue in self.queues:
+            await queue.put(("announce", filename, None, None))
+
+    async def publish(self, filename, records):
+        """Queue a document for every sink; returns an awaitable that resolves once all have it"""
+        loop = asyncio.get_running_loop()
+        done = [loop.create_future() for _ in self.sinks]
+        for queue, fut in zip(self.queues, done):
+            await queue.put(("publish", filename, records, fut))
+        return asyncio.gather(*done)
+
+    async def _consume(self, sink, queue):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            kind, filename, records, done = item
+            try:
+                if kind == "announce":
+                    await sink.announce(filename)
+                else:
+                    await sink.publish(filename, records)
+            except Exception as e:
+                print("SINK FAILED", sink.name, filename, e)
+            finally:
+                if done:
+                    done.set_result(None)
+
+def print_metrics(sinks):
+    print("\n=== Sinks ===")
+    for sink in sinks:
+        print(f"{sink.name}: {sink.metrics.summary()}")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Optional warm worker that keeps the PDF stack imported between runs.
+
+    ./worker.py &     # loads fitz, pdfplumber and PIL once, then waits
+    ./run.py          # hands extraction to the worker when it is listening
+
+run.py and parse.py fall back to extracting in-process when no worker is
+running, so starting one is purely an optimisation for frequent cron ticks.
+"""
+import os, signal, sys
+from multiprocessing.connection import Listener, Client, AuthenticationError
+
+WORKER_SOCKET = ".pdfworker.sock"  # Unix socket in the working directory, next to new/ and archive/
+WORKER_KEY = ".pdfworker.key"      # random per worker start, readable only by its owner
+
+def extract_via_worker(pdf_path, which="run"):
+    """Ask a running worker to extract pdf_path; None if there is no worker to ask"""
+    if not os.path.exists(WORKER_SOCKET):
+        return None
+    try:
+        with open(WORKER_KEY, "rb") as f:
+            authkey = f.read()
+        with Client(WORKER_SOCKET, family="AF_UNIX", authkey=authkey) as conn:
+            conn.send((which, os.path.abspath(pdf_path)))
+            ok, result = conn.recv()
+    except (OSError, EOFError, AuthenticationError) as e:
+        print("Worker unavailable, extracting locally:", e)
+        return None
+    if ok is None:
+        print("Worker", result, "- extracting locally")
+        return None
+    if not ok:
+        raise RuntimeError(result)
+    return result
+
+def _mtimes(paths):
+    return {p: os.path.getmtime(p) for p in paths}
+
+def serve():
+    # Pay the import cost once, up front
+    import fitz, pdfplumber
+    from PIL import Image
+    import run, parse, pages
+    extractors = {"run": run.extract_records, "parse": parse.extract_records}
+    # The imported code is frozen for the worker's lifetime; restart when any source changes
+    sources = _mtimes([os.path.abspath(m.__file__) for m in (run, parse, pages)] + [os.path.abspath(__file__)])
+
+    # The listener unpickles what it receives, so only the owner may connect or read the key
+    old_umask = os.umask(0o077)
+    try:
+        for path in (WORKER_SOCKET, WORKER_KEY):
+            if os.path.exists(path):
+                os.unlink(path)
+        authkey = os.urandom(32)
+        fd = os.open(WORKER_KEY, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(authkey)
+        listener = Listener(WORKER_SOCKET, family="AF_UNIX", authkey=authkey)
+    finally:
+        os.umask(old_umask)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # so kill/systemd still runs the cleanup below
+    print("Worker listening on", os.path.abspath(WORKER_SOCKET))
+
+    restart = False
+    try:
+        while not restart:
+            try:
+                conn = listener.accept()
+            except (OSError, AuthenticationError) as e:
+                print("Rejected connection:", e)
+                continue
+            with conn:
+                try:
+                    which, path = conn.recv()
+                    if _mtimes(sources) != sources:
+                        print("Source files changed, restarting")
+                        conn.send((None, "is restarting after a code change"))
+                        restart = True
+                        continue
+                    print("Extract", which, os.path.basename(path))
+                    conn.send((True, extractors[which](path)))
+                except Exception as e:
+                    try:
+                        conn.send((False, f"{type(e).__name__}: {e}"))
+                    except OSError:
+                        pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()  # also removes the socket file
+        if os.path.exists(WORKER_KEY):
+            os.unlink(WORKER_KEY)
+
+    if restart:
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+if __name__ == "__main__":
+    serve()